@@ -1,12 +1,17 @@
 # %%
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
+import matplotlib.dates as mdates
 import matplotlib.pyplot as plt
 import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
 from smard_data.config import Variable
 from smard_data.paths import ProjPaths
 
 # Set consistent style for all plots
 plt.style.use('seaborn-v0_8')
+plt.rcParams['agg.path.chunksize'] = 10000  # render long paths in chunks
 FIGSIZE = (12, 6)  # Single standard figure size for all plots
 
 # Color schemes
@@ -32,34 +37,103 @@ CATEGORY_COLORS = {
     'Storage': '#3498DB'
 }
 
-def load_generation_data():
-    """Load and prepare generation data from all sources."""
-    paths = ProjPaths()
-    generation_vars = [Variable.get_name(var) for var in Variable.get_generation_variables()]
-    
-    # Get paths to generation data files
-    data_files = []
-    for var in generation_vars:
-        file = paths.generation_raw_data_path / f"{var}_quarterhour.parquet"
+def read_parquet_files(files):
+    """Read parquet files concurrently, returning dataframes in input order.
+
+    Float columns are downcast to float32.
+
+    Args:
+        files: Mapping of variable name to parquet file; only that variable's
+            column (plus the timestamp index) is read from each file.
+    """
+    def read_file(var, file):
+        # Memory-mapped, pre-fetched column chunk reads
+        table = pq.read_table(file, columns=[var], use_threads=True, memory_map=True,
+                              use_pandas_metadata=True, pre_buffer=True, buffer_size=1 << 20)
+        # float32 is ample precision for plotting and halves memory for all aggregations
+        table = table.cast(pa.schema([
+            field.with_type(pa.float32()) if pa.types.is_floating(field.type) else field
+            for field in table.schema
+        ], metadata=table.schema.metadata))
+        # The Arrow table is released column by column while converting to pandas
+        return table.to_pandas(self_destruct=True, split_blocks=True)
+
+    # pyarrow releases the GIL while decoding, so threads overlap I/O and decompression
+    with ThreadPoolExecutor(max_workers=min(8, len(files))) as executor:
+        return list(executor.map(read_file, files.keys(), files.values()))
+
+def read_combined_cached(cache, files, combine):
+    """Return the combined frame of several raw files, cached as one parquet file.
+
+    The cache is used while it is newer than every source file and holds
+    exactly their variables; otherwise the frame is rebuilt and rewritten.
+
+    Args:
+        cache: Path of the parquet cache file
+        files: Mapping of variable name to raw parquet file
+        combine: Callable building the combined DataFrame from the raw files
+    """
+    if cache.exists() and cache.stat().st_mtime >= max(f.stat().st_mtime for f in files.values()):
+        df = pd.read_parquet(cache, engine='pyarrow')
+        if list(df.columns) == list(files):
+            return df
+
+    df = combine()
+    cache.parent.mkdir(parents=True, exist_ok=True)
+    df.to_parquet(cache, engine='pyarrow', compression='zstd')
+    return df
+
+def drop_duplicate_timestamps(df):
+    """Keep the first row per timestamp of a frame with a sorted DatetimeIndex."""
+    # Duplicates are adjacent in a sorted index, so comparing neighbours suffices
+    values = df.index.asi8
+    keep = np.empty(values.size, dtype=bool)
+    keep[:1] = True
+    np.not_equal(values[1:], values[:-1], out=keep[1:])
+    return df if keep.all() else df.iloc[keep]
+
+def load_quarterhour_data(raw_data_path, variables, label, scale=1):
+    """Load the quarter-hour files of several variables into one frame.
+
+    Args:
+        raw_data_path: Directory of the raw parquet files
+        variables: Variable names, in the column order of the result
+        label: Name of the data set, used for the cache file and error messages
+        scale: Factor applied to all values
+
+    Returns:
+        pd.DataFrame: Sorted, deduplicated frame with one column per available variable
+    """
+    # Get paths to data files, in column order so the combined frame needs no reindexing
+    data_files = {}
+    for var in variables:
+        file = raw_data_path / f"{var}_quarterhour.parquet"
         if file.exists():
-            data_files.append(file)
+            data_files[var] = file
 
     if not data_files:
-        raise RuntimeError("No generation data files found")
+        raise RuntimeError(f"No {label} data files found")
 
-    # Load and concatenate generation files
-    dfs = []
-    for file in data_files:
-        df_temp = pd.read_parquet(file)
-        dfs.append(df_temp)
+    def combine():
+        # Load and combine all files
+        df = pd.concat(read_parquet_files(data_files), axis=1)
+        
+        # Sort and clean data; the raw files are stored sorted, so this is usually a no-op check
+        if not df.index.is_monotonic_increasing:
+            df = df.sort_index()
+        return drop_duplicate_timestamps(df)
 
-    # Combine all dataframes
-    df_combined = pd.concat(dfs, axis=1)
-    df_combined = df_combined * 4  # normalize to hourly frequency
-    
-    # Sort and clean data
-    df_combined = df_combined.sort_index()
-    df_combined = df_combined[~df_combined.index.duplicated(keep='first')]
+    df = read_combined_cached(ProjPaths().processed_data_path / f"{label}_combined_unscaled.parquet",
+                              data_files, combine)
+    # The cache holds unscaled values, so it stays valid for any scale
+    if scale != 1:
+        df = df * scale
+    return df
+
+def load_generation_data():
+    """Load and prepare generation data from all sources."""
+    paths = ProjPaths()
+    generation_vars = [Variable.get_name(var) for var in Variable.get_generation_variables()]
     
     # Group columns by energy type
     renewable_cols = ['SOLAR', 'WIND_OFFSHORE', 'WIND_ONSHORE', 'BIOMASS', 'HYDRO', 'OTHER_RENEWABLE']
@@ -67,34 +141,85 @@ def load_generation_data():
     storage_cols = ['PUMPED_STORAGE']
     
     sorted_cols = renewable_cols + conventional_cols + storage_cols
-    assert set(sorted_cols) == set(df_combined.columns), "Missing or extra columns detected"
+    assert set(sorted_cols) == set(generation_vars), "Column groups do not match generation variables"
     
-    return df_combined[sorted_cols]
+    # Scale by 4 to normalize to hourly frequency
+    df_combined = load_quarterhour_data(paths.generation_raw_data_path, sorted_cols, 'generation', scale=4)
+    assert list(df_combined.columns) == sorted_cols, "Missing or extra columns detected"
+    
+    return df_combined
 
 def load_consumption_data():
     """Load and prepare consumption/load data."""
     paths = ProjPaths()
-    load_vars = [Variable.get_name(var) for var in Variable.get_consumption_variables()]
+    # Only total and residual load are used in the analysis
+    load_vars = [Variable.get_name(var) for var in (Variable.TOTAL_LOAD, Variable.RESIDUAL_LOAD)]
     
-    load_files = []
-    for var in load_vars:
-        file = paths.consumption_raw_data_path / f"{var}_quarterhour.parquet"
-        if file.exists():
-            load_files.append(file)
+    return load_quarterhour_data(paths.consumption_raw_data_path, load_vars, 'consumption')
 
-    if not load_files:
-        raise RuntimeError("No load data files found")
+def calendar_keys(index):
+    """Return month (1-12) and hour (0-23) of a DatetimeIndex as int8 keys."""
+    return index.month.to_numpy(np.int8), index.hour.to_numpy(np.int8)
 
-    load_dfs = []
-    for file in load_files:
-        df_temp = pd.read_parquet(file)
-        load_dfs.append(df_temp)
+def calendar_means(df, month, hour):
+    """Mean of every column by month and by hour of day in a single pass each.
 
-    df_load = pd.concat(load_dfs, axis=1)
-    df_load = df_load.sort_index()
-    df_load = df_load[~df_load.index.duplicated(keep='first')]
-    
-    return df_load
+    Missing values are ignored, as in a pandas groupby mean.
+
+    Args:
+        df: DataFrame with numeric columns
+        month: Month (1-12) of each row, see calendar_keys
+        hour: Hour of day (0-23) of each row, see calendar_keys
+
+    Returns:
+        tuple[pd.DataFrame, pd.DataFrame]: Means indexed by month and by hour
+    """
+    values = df.to_numpy(dtype=np.float64)
+    valid = ~np.isnan(values)
+    filled = np.where(valid, values, 0.0)
+    n_cols = values.shape[1]
+    col_offsets = np.arange(n_cols)
+
+    def bin_means(keys, n_bins):
+        # One bincount over all (key, column) cells instead of a groupby per column
+        bins = (keys.astype(np.int64)[:, None] * n_cols + col_offsets).ravel()
+        sums = np.bincount(bins, weights=filled.ravel(), minlength=n_bins * n_cols)
+        counts = np.bincount(bins, weights=valid.ravel(), minlength=n_bins * n_cols)
+        with np.errstate(invalid='ignore'):
+            return (sums / counts).reshape(n_bins, n_cols)
+
+    monthly = pd.DataFrame(bin_means(month, 13)[1:], index=range(1, 13), columns=df.columns)
+    hourly = pd.DataFrame(bin_means(hour, 24), index=range(24), columns=df.columns)
+    return monthly, hourly
+
+def ecdf_points(data, n_points=1024):
+    """Return (values, probabilities) of the ECDF, thinned to at most n_points."""
+    sorted_data = np.sort(np.asarray(data))
+    n = len(sorted_data)
+    # Evenly spaced ranks keep the curve shape while bounding the plotted vertices
+    ranks = np.unique(np.linspace(0, n - 1, min(n, n_points)).astype(np.int64))
+    return sorted_data[ranks], (ranks + 1) / n
+
+def plot_histogram(ax, data, bins=50):
+    """Draw a histogram from counts binned in numpy, ignoring missing values."""
+    values = np.asarray(data)
+    counts, edges = np.histogram(values[~np.isnan(values)], bins=bins)
+    ax.bar(edges[:-1], counts, width=np.diff(edges), align='edge', edgecolor='black')
+
+def plot_stacked_area(ax, x, values, columns):
+    """Draw a stacked area plot of generation sources in one stackplot call.
+
+    Args:
+        ax: Axes to draw on
+        x: Values of the x-axis
+        values: 2D array with one row per x value and one column per source
+        columns: Generation source names of the value columns
+    """
+    ax.stackplot(x, np.nan_to_num(values).T, labels=columns,
+                 colors=[GENERATION_COLORS[col] for col in columns])
+    ax.margins(x=0)
+    ax.xaxis.set_major_locator(mdates.YearLocator())
+    ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y'))
 
 def style_plot(fig, ax, title, xlabel, ylabel, annotation=None):
     """Apply consistent styling to plots."""
@@ -120,9 +245,12 @@ def style_plot(fig, ax, title, xlabel, ylabel, annotation=None):
 # %%
 # Load the data
 df_load = load_consumption_data()
+load_month, load_hour = calendar_keys(df_load.index)
 
 def plot_demand_overview():
     """Create overview plots of power demand."""
+    load_monthly, load_hourly = calendar_means(df_load[['TOTAL_LOAD']], load_month, load_hour)
+    
     # Yearly total load trend
     fig, ax = plt.subplots(figsize=FIGSIZE)
     monthly_load = df_load['TOTAL_LOAD'].resample('ME').sum() / 1000  # Convert to GWh
@@ -141,7 +269,7 @@ def plot_demand_overview():
     
     # Monthly pattern
     fig, ax = plt.subplots(figsize=FIGSIZE)
-    monthly_load = df_load.groupby(df_load.index.month)['TOTAL_LOAD'].mean()
+    monthly_load = load_monthly['TOTAL_LOAD']
     
     ax.plot(range(1,13), monthly_load.values, marker='o')
     ax.set_xticks(range(1,13))
@@ -161,7 +289,7 @@ def plot_demand_overview():
     
     # Daily pattern
     fig, ax = plt.subplots(figsize=FIGSIZE)
-    hourly_load = df_load.groupby(df_load.index.hour)['TOTAL_LOAD'].mean()
+    hourly_load = load_hourly['TOTAL_LOAD']
     
     ax.plot(hourly_load.index, hourly_load.values, marker='o')
     ax.set_xticks(range(0, 24, 2))
@@ -186,6 +314,9 @@ plot_demand_overview()
 # %%
 # Load generation data
 df_combined = load_generation_data()
+gen_month, gen_hour = calendar_keys(df_combined.index)
+# Total wind as a standalone array, so the per-source columns of df_combined stay untouched
+wind_total = np.add(df_combined['WIND_OFFSHORE'].to_numpy(), df_combined['WIND_ONSHORE'].to_numpy())
 
 def plot_generation_mix_evolution():
     """Plot the evolution of the generation mix over time."""
@@ -194,7 +325,8 @@ def plot_generation_mix_evolution():
     
     # Absolute generation
     fig, ax = plt.subplots(figsize=FIGSIZE)
-    monthly_gen.plot(kind='area', stacked=True, ax=ax, color=[GENERATION_COLORS[col] for col in monthly_gen.columns])
+    monthly_values = monthly_gen.to_numpy()
+    plot_stacked_area(ax, monthly_gen.index, monthly_values, monthly_gen.columns)
     
     annotation = ("Key observations:\n"
                  "- Increasing renewable contribution\n"
@@ -213,8 +345,9 @@ def plot_generation_mix_evolution():
     
     # Percentage contribution
     fig, ax = plt.subplots(figsize=FIGSIZE)
-    monthly_gen_pct = monthly_gen.div(monthly_gen.sum(axis=1), axis=0) * 100
-    monthly_gen_pct.plot(kind='area', stacked=True, ax=ax, color=[GENERATION_COLORS[col] for col in monthly_gen_pct.columns])
+    # Sources without data in a month are left out of its total, as in pandas sums
+    monthly_gen_pct = monthly_values / np.nansum(monthly_values, axis=1, keepdims=True) * 100
+    plot_stacked_area(ax, monthly_gen.index, monthly_gen_pct, monthly_gen.columns)
     
     annotation = ("Relative contribution changes:\n"
                  "Steady increase in renewable share over time, particularly from wind and solar sources")
@@ -235,11 +368,17 @@ plot_generation_mix_evolution()
 # %%
 def plot_renewable_patterns():
     """Analyze and plot renewable generation patterns."""
+    renewables = pd.DataFrame({'SOLAR': df_combined['SOLAR'].to_numpy(), 'WIND_TOTAL': wind_total},
+                              index=df_combined.index)
+    
+    # Monthly and hourly means for solar and wind
+    monthly_means, hourly_means = calendar_means(renewables, gen_month, gen_hour)
+    
     # Solar generation patterns
     fig, axes = plt.subplots(2, 1, figsize=FIGSIZE)
     
     # Monthly solar pattern
-    monthly_solar = df_combined['SOLAR'].groupby(df_combined.index.month).mean()
+    monthly_solar = monthly_means['SOLAR']
     axes[0].plot(range(1,13), monthly_solar.values, marker='o', color=GENERATION_COLORS['SOLAR'])
     axes[0].set_xticks(range(1,13))
     axes[0].set_xticklabels(['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
@@ -256,7 +395,7 @@ def plot_renewable_patterns():
               annotation_solar)
     
     # Hourly solar pattern
-    hourly_solar = df_combined['SOLAR'].groupby(df_combined.index.hour).mean()
+    hourly_solar = hourly_means['SOLAR']
     axes[1].plot(hourly_solar.index, hourly_solar.values, marker='o', color=GENERATION_COLORS['SOLAR'])
     axes[1].set_xticks(range(0, 24, 2))
     axes[1].set_xticklabels([f"{hour:02d}:00" for hour in range(0, 24, 2)])
@@ -274,12 +413,10 @@ def plot_renewable_patterns():
     plt.show()
     
     # Wind generation patterns
-    df_combined['WIND_TOTAL'] = df_combined['WIND_OFFSHORE'] + df_combined['WIND_ONSHORE']
-    
     fig, axes = plt.subplots(2, 1, figsize=FIGSIZE)
     
     # Monthly wind pattern
-    monthly_wind = df_combined['WIND_TOTAL'].groupby(df_combined.index.month).mean()
+    monthly_wind = monthly_means['WIND_TOTAL']
     axes[0].plot(range(1,13), monthly_wind.values, marker='o', color='blue')
     axes[0].set_xticks(range(1,13))
     axes[0].set_xticklabels(['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
@@ -295,7 +432,7 @@ def plot_renewable_patterns():
               annotation_wind)
     
     # Hourly wind pattern
-    hourly_wind = df_combined['WIND_TOTAL'].groupby(df_combined.index.hour).mean()
+    hourly_wind = hourly_means['WIND_TOTAL']
     axes[1].plot(hourly_wind.index, hourly_wind.values, marker='o', color='blue')
     axes[1].set_xticks(range(0, 24, 2))
     axes[1].set_xticklabels([f"{hour:02d}:00" for hour in range(0, 24, 2)])
@@ -320,15 +457,18 @@ plot_renewable_patterns()
 def plot_grid_stability():
     """Analyze and plot grid stability metrics."""
     # Calculate residual load percentage
-    residual_pct = (df_load['RESIDUAL_LOAD'] / df_load['TOTAL_LOAD'] * 100).clip(lower=0)
+    # Computed in place in a single buffer instead of one temporary Series per step
+    residual_pct = np.divide(df_load['RESIDUAL_LOAD'].to_numpy(), df_load['TOTAL_LOAD'].to_numpy())
+    np.multiply(residual_pct, 100, out=residual_pct)
+    np.maximum(residual_pct, 0, out=residual_pct)
+    residual_pct = pd.Series(residual_pct, index=df_load.index)
     
     # Monthly maximum and mean residual load
     fig, ax = plt.subplots(figsize=FIGSIZE)
-    monthly_max_residual = residual_pct.resample('ME').max()
-    monthly_mean_residual = residual_pct.resample('ME').mean()
+    monthly_residual = residual_pct.resample('ME').agg(['max', 'mean'])
     
-    ax.plot(monthly_max_residual.index, monthly_max_residual.values, label='Maximum')
-    ax.plot(monthly_mean_residual.index, monthly_mean_residual.values, label='Mean')
+    ax.plot(monthly_residual.index, monthly_residual['max'].values, label='Maximum')
+    ax.plot(monthly_residual.index, monthly_residual['mean'].values, label='Mean')
     ax.legend()
     ax.set_ylim(bottom=0)  # Set y-axis to start at 0
     
@@ -343,15 +483,16 @@ def plot_grid_stability():
               annotation)
     plt.show()
     
-    # Get second and second last full years
-    years = residual_pct.index.year.unique()
+    # Partition by year once; get second and second last full years
+    data_by_year = dict(list(residual_pct.groupby(residual_pct.index.year)))
+    years = list(data_by_year)
     second_year = years[1]
     second_last_year = years[-2]
     
     # Plot distribution for second year
     fig, ax = plt.subplots(figsize=FIGSIZE)
-    year_data = residual_pct[residual_pct.index.year == second_year]
-    ax.hist(year_data, bins=50, edgecolor='black')
+    year_data = data_by_year[second_year]
+    plot_histogram(ax, year_data)
     
     annotation = (f"Year {second_year}\n"
                  "Distribution shows how often different levels of conventional\n"
@@ -366,8 +507,8 @@ def plot_grid_stability():
     
     # Plot distribution for second last year
     fig, ax = plt.subplots(figsize=FIGSIZE)
-    year_data = residual_pct[residual_pct.index.year == second_last_year]
-    ax.hist(year_data, bins=50, edgecolor='black')
+    year_data = data_by_year[second_last_year]
+    plot_histogram(ax, year_data)
     
     annotation = (f"Year {second_last_year}\n"
                  "Distribution shows how often different levels of conventional\n"
@@ -384,15 +525,13 @@ def plot_grid_stability():
     fig, ax = plt.subplots(figsize=FIGSIZE)
     
     # Calculate and plot ECDF for second year
-    year_data = residual_pct[residual_pct.index.year == second_year]
-    sorted_data = np.sort(year_data)
-    ecdf = np.arange(1, len(sorted_data) + 1) / len(sorted_data)
+    year_data = data_by_year[second_year]
+    sorted_data, ecdf = ecdf_points(year_data)
     ax.plot(sorted_data, ecdf, label=str(second_year))
     
     # Calculate and plot ECDF for second last year  
-    year_data = residual_pct[residual_pct.index.year == second_last_year]
-    sorted_data = np.sort(year_data)
-    ecdf = np.arange(1, len(sorted_data) + 1) / len(sorted_data)
+    year_data = data_by_year[second_last_year]
+    sorted_data, ecdf = ecdf_points(year_data)
     ax.plot(sorted_data, ecdf, label=str(second_last_year))
     
     annotation = ("Empirical Cumulative Distribution Function shows\n"
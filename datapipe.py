@@ -5,47 +5,61 @@ Each step checks if its output already exists before running.
 """
 
 import click
+import functools
+import os
 from pathlib import Path
-from typing import List
 from smard_data.config import Variable, Resolution
 from smard_data.paths import ProjPaths
 
 
-def get_output_files(job_name: str) -> List[Path]:
+@functools.cache
+def get_output_files(job_name: str) -> tuple[Path, ...]:
     """Get expected output files for a job."""
     paths = ProjPaths()
     
     if job_name == "download-generation":
-        return [
+        return tuple(
             paths.raw_data_path / f"{Variable.get_name(var)}_{Resolution.QUARTER_HOUR.value}.parquet"
             for var in Variable.get_generation_variables()
-        ]
+        )
     elif job_name == "download-consumption":
-        return [
+        return tuple(
             paths.raw_data_path / f"{Variable.get_name(var)}_{Resolution.QUARTER_HOUR.value}.parquet"
             for var in Variable.get_consumption_variables()
-        ]
+        )
     elif job_name == "download-prices":
-        return [
+        return tuple(
             paths.raw_data_path / f"{Variable.get_name(var)}_{Resolution.QUARTER_HOUR.value}.parquet"
             for var in Variable.get_price_variables()
-        ]
+        )
     elif job_name == "download-forecasts":
-        return [
+        return tuple(
             paths.raw_data_path / f"{Variable.get_name(var)}_{Resolution.QUARTER_HOUR.value}.parquet"
             for var in Variable.get_forecast_variables()
-        ]
+        )
     elif job_name == "download-all":
-        return [
+        return tuple(
             paths.raw_data_path / f"{Variable.get_name(var.value)}_{Resolution.QUARTER_HOUR.value}.parquet"
             for var in Variable
-        ]
-    return []
+        )
+    return ()
+
+
+def list_file_names(directory: Path) -> set[str]:
+    """List the names of all entries in a directory, or none if it does not exist."""
+    try:
+        with os.scandir(directory) as entries:
+            return {entry.name for entry in entries}
+    except FileNotFoundError:
+        return set()
 
 
 def check_outputs(job_name: str) -> bool:
     """Check if all output files for a job exist."""
-    return all(f.exists() for f in get_output_files(job_name))
+    # One directory listing per output directory instead of a stat call per file
+    output_files = get_output_files(job_name)
+    existing = {directory: list_file_names(directory) for directory in {f.parent for f in output_files}}
+    return not any(f.name not in existing[f.parent] for f in output_files)
 
 
 @click.group()
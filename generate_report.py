@@ -1,83 +1,132 @@
-import subprocess
+import hashlib
+import importlib.metadata
+import multiprocessing
 import sys
+from concurrent.futures import FIRST_EXCEPTION, ProcessPoolExecutor, wait
 from pathlib import Path
+import click
+import jupytext
+import nbformat
+from jupyter_client.manager import KernelManager
+from nbconvert.exporters import HTMLExporter, MarkdownExporter, PDFExporter
+from nbconvert.preprocessors import ExecutePreprocessor
+from nbconvert.writers import FilesWriter
 from smard_data.paths import ProjPaths
 
-def run_command(command):
-    """Helper function to run a shell command and check for errors."""
-    print(f"Running: {' '.join(command)}")
-    result = subprocess.run(command, capture_output=True, text=True, check=False) # check=False to handle error manually
-    if result.returncode != 0:
-        print(f"Error running command: {' '.join(command)}", file=sys.stderr)
-        print(f"Stderr: {result.stderr}", file=sys.stderr)
-        print(f"Stdout: {result.stdout}", file=sys.stderr)
-        sys.exit(f"Command failed with exit code {result.returncode}")
-    print(result.stdout)
-    return result
+def _export(kind, nb, report_dir, notebook_name, pdf_engine="weasyprint"):
+    """Export an executed notebook as an HTML, Markdown or PDF report into `report_dir`."""
+    resources = {"unique_key": notebook_name, "output_files_dir": f"{notebook_name}_files"}
+    writer = FilesWriter(build_directory=str(report_dir))
+    if kind == "markdown":
+        body, resources = MarkdownExporter(exclude_input=True).from_notebook_node(nb, resources=resources)
+        writer.write(body, resources, notebook_name=notebook_name)
+        return
+    if kind == "pdf" and pdf_engine == "latex":
+        body, resources = PDFExporter(exclude_input=True).from_notebook_node(nb, resources=resources)
+        writer.write(body, resources, notebook_name=notebook_name)
+        return
+    body, resources = HTMLExporter(template_name="basic", exclude_input=True).from_notebook_node(nb, resources=resources)
+    if kind == "html":
+        writer.write(body, resources, notebook_name=notebook_name)
+    else:
+        # Render the PDF from the HTML report with WeasyPrint instead of a LaTeX toolchain
+        from weasyprint import HTML
+        HTML(string=body, base_url=str(report_dir)).write_pdf(report_dir / f"{notebook_name}.pdf")
 
 def ensure_output_dir(report_dir):
     """Ensure the output directory exists"""
     report_dir.mkdir(parents=True, exist_ok=True)
 
-def generate_report(python_script):
-    """Generate HTML report from Python script using Jupyter"""
+def raw_data_files():
+    """List the raw data files the analysis scripts read, in a stable order."""
+    return [path for path in sorted(ProjPaths.raw_data_path.rglob("*")) if path.is_file()]
+
+def notebook_cache_key(script_path):
+    """Hash the analysis script, package version and raw data files that determine the executed notebook."""
+    key = hashlib.blake2b(script_path.read_bytes())
+    try:
+        key.update(importlib.metadata.version("smard-data").encode())
+    except importlib.metadata.PackageNotFoundError:
+        pass
+    for data_file in raw_data_files():
+        stat = data_file.stat()
+        key.update(f"{data_file}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return key.hexdigest()[:16]
+
+def report_is_up_to_date(script_path, outputs):
+    """Check whether all report outputs exist and are newer than the script and the raw data files."""
+    if not all(output.exists() for output in outputs):
+        return False
+    newest_input = max(path.stat().st_mtime for path in [script_path, *raw_data_files()])
+    return min(output.stat().st_mtime for output in outputs) > newest_input
+
+def reset_kernel(km, working_dir):
+    """Clear the previous script's variables and move a running kernel to `working_dir`"""
+    # Imported modules stay loaded, which is what makes reusing the kernel cheap. Clients sharing
+    # the kernel session must not overlap, so this one is closed before the notebook's client starts.
+    kc = km.client()
+    kc.start_channels()
+    try:
+        kc.wait_for_ready(timeout=60)
+        kc.execute_interactive(f"%reset -f\n__import__('os').chdir({str(working_dir)!r})", silent=True)
+    finally:
+        kc.stop_channels()
+
+def generate_report(python_script, output_dir=ProjPaths.reports_path, use_cache=True, pdf_engine="weasyprint", km=None, force=False):
+    """Generate HTML report from Python script using Jupyter, optionally in the kernel of `km`"""
     script_path = Path(python_script)
     if not script_path.exists():
         sys.exit(f"Analysis script not found: {python_script}")
         
     # Create report subdirectory based on script name
     script_basename = script_path.stem
-    report_dir = ProjPaths().reports_path / script_basename
+    report_dir = Path(output_dir) / script_basename
     ensure_output_dir(report_dir)
     
     # Define output files
-    notebook_file = report_dir / f"{script_basename}.ipynb"
     html_output = report_dir / f"{script_basename}.html"
     markdown_output = report_dir / f"{script_basename}.md"
     pdf_output = report_dir / f"{script_basename}.pdf"
 
-    print(f"STEP 1: Converting {python_script} to {notebook_file} using jupytext...")
-    run_command(["jupytext", "--to", "notebook", "--output", str(notebook_file), str(script_path)])
+    # Non-default options may change the outputs, so they always regenerate the report
+    skip_allowed = not force and use_cache and pdf_engine == "weasyprint"
+    if skip_allowed and report_is_up_to_date(script_path, [html_output, markdown_output, pdf_output]):
+        print(f"Report for {python_script} is up to date. Use --force to regenerate.")
+        return
 
-    print(f"\nSTEP 2: Executing {notebook_file} and saving outputs (in place)...")
-    run_command([
-        "jupyter", "nbconvert",
-        "--to", "notebook",
-        "--execute",
-        "--inplace",
-        str(notebook_file)
-    ])
+    print(f"STEP 1: Converting {python_script} to a notebook using jupytext...")
+    nb = jupytext.read(script_path)
 
-    print(f"\nSTEP 3: HTML Exporting executed {notebook_file} to {html_output}...")
-    run_command([
-        "jupyter", "nbconvert",
-        "--to", "html",
-        "--template", "basic",
-        "--no-input",
-        "--output", str(html_output),
-        str(notebook_file)
-    ])
+    print("\nSTEP 2: Executing notebook...")
+    # Reuse the executed notebook when neither the script nor its inputs have changed
+    cached_notebook = Path(output_dir) / ".cache" / f"{script_basename}.{notebook_cache_key(script_path)}.ipynb"
+    if use_cache and cached_notebook.exists():
+        print(f"Using cached executed notebook {cached_notebook}")
+        nb = nbformat.read(cached_notebook, as_version=4)
+    else:
+        if km is None:
+            ExecutePreprocessor(timeout=None).preprocess(nb, {"metadata": {"path": str(report_dir)}})
+        else:
+            if not km.has_kernel:
+                km.start_kernel()
+            reset_kernel(km, report_dir)
+            executor = ExecutePreprocessor(timeout=None)
+            executor.preprocess(nb, {"metadata": {"path": str(report_dir)}}, km=km)
+            executor.kc.stop_channels()
+        ensure_output_dir(cached_notebook.parent)
+        # Entries for earlier versions of the script or its inputs are never read again
+        for stale_notebook in cached_notebook.parent.glob(f"{script_basename}.{'[0-9a-f]' * 16}.ipynb"):
+            stale_notebook.unlink()
+        nbformat.write(nb, cached_notebook)
 
-    print(f"\nSTEP 4: Markdown Exporting executed {notebook_file} to {markdown_output}...")
-    run_command([
-        "jupyter", "nbconvert",
-        "--to", "markdown",
-        "--output", str(markdown_output),
-        "--no-input",
-        str(notebook_file)
-    ])
-    
-    print(f"\nSTEP 5: PDF Exporting executed {notebook_file} to {pdf_output}...")
-    run_command([
-        "jupyter", "nbconvert",
-        "--to", "pdf",
-        "--output", str(pdf_output),
-        "--no-input",
-        str(notebook_file)
-    ])
-
-    # Clean up intermediate notebook file
-    notebook_file.unlink()
+    # The exports only read the executed notebook, so each runs in its own process
+    print(f"\nSTEP 3-5: Exporting executed notebook to {html_output}, {markdown_output} and {pdf_output}...")
+    # Spawned rather than forked workers, since a shared kernel manager runs threads in this process
+    with ProcessPoolExecutor(max_workers=3, mp_context=multiprocessing.get_context("spawn")) as executor:
+        futures = [executor.submit(_export, kind, nb, report_dir, script_basename, pdf_engine) for kind in ("html", "markdown", "pdf")]
+        done, _ = wait(futures, return_when=FIRST_EXCEPTION)
+        for future in done:
+            future.result()
 
     print("\n-------------------------------------")
     print("Report generation complete!")
@@ -89,7 +138,26 @@ def generate_report(python_script):
     print(f"- PDF report: {pdf_output}")
     print("-------------------------------------")
 
+def generate_reports(python_scripts, output_dir=ProjPaths.reports_path, use_cache=True, pdf_engine="weasyprint", force=False):
+    """Generate reports for several Python scripts, executing them all in one Jupyter kernel"""
+    # The kernel is only started once a script actually needs executing
+    km = KernelManager(kernel_name="python3")
+    try:
+        for python_script in python_scripts:
+            generate_report(python_script, output_dir=output_dir, use_cache=use_cache, pdf_engine=pdf_engine, km=km, force=force)
+    finally:
+        if km.has_kernel:
+            km.shutdown_kernel(now=True)
+
+@click.command()
+@click.argument('python_scripts', nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False))
+@click.option('--output-dir', default=ProjPaths.reports_path, type=click.Path(file_okay=False), help='Directory to write the report into')
+@click.option('--no-cache', is_flag=True, help='Re-execute the notebook even if a cached run exists')
+@click.option('--pdf-engine', default='weasyprint', type=click.Choice(['weasyprint', 'latex']), help='Render the PDF from the HTML report or with nbconvert\'s LaTeX toolchain')
+@click.option('--force', is_flag=True, help='Regenerate reports even if they are newer than their inputs')
+def main(python_scripts: tuple, output_dir: str, no_cache: bool, pdf_engine: str, force: bool):
+    """Generate HTML, Markdown and PDF reports from one or more analysis scripts."""
+    generate_reports(python_scripts, output_dir=output_dir, use_cache=not no_cache, pdf_engine=pdf_engine, force=force)
+
 if __name__ == '__main__':
-    if len(sys.argv) != 2:
-        sys.exit("Usage: python generate_report.py <analysis_script.py>")
-    generate_report(sys.argv[1])
\ No newline at end of file
+    main()
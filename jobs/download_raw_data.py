@@ -39,10 +39,11 @@ def download_variables(variables: List[int], output_path):
             variable_name=variable_name,
             start_time=start_time
         )
-        # Save to parquet file
+        # Save to parquet file; readers always load whole columns, so the
+        # default row groups are kept
         filename = f"{variable_name}_{Resolution.QUARTER_HOUR.value}.parquet"
         file_path = output_path / filename
-        df.to_parquet(file_path)
+        df.to_parquet(file_path, compression="zstd", compression_level=3)
         print(f"Saved data to {file_path}")
 
 
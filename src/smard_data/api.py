@@ -1,22 +1,43 @@
 """API functions for interacting with SMARD data."""
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import requests
 import pandas as pd
 from typing import List, Tuple, Optional
 
+def _fetch_series(data_url: str) -> Optional[List[Tuple[int, float]]]:
+    """Fetch the observations of a single data block.
+
+    Args:
+        data_url: URL of the data block
+
+    Returns:
+        Optional[List[Tuple[int, float]]]: (timestamp, value) pairs, or None
+            if the request failed
+    """
+    data_response = requests.get(data_url)
+
+    if data_response.status_code != 200:
+        print(f"Warning: Error fetching data from {data_url}: {data_response.status_code}")
+        return None
+
+    return data_response.json()["series"]
+
 def download_smard_data(
     region: str, 
     resolution: str, 
     variable: int, 
     variable_name: str,
-    start_time: Optional[datetime] = None
+    start_time: Optional[datetime] = None,
+    max_workers: int = 8
 ) -> pd.DataFrame:
     """Download data from SMARD API for given parameters.
     
     Note: The SMARD API uses a block-based data retrieval system where we first get
     timestamps marking the start of data blocks (e.g. weekly chunks), then fetch
-    the actual observations for each block in separate requests.
+    the actual observations for each block in separate requests. The block
+    requests are independent and are issued concurrently.
     
     Args:
         region: Region code (e.g. 'DE' for Germany)
@@ -25,6 +46,7 @@ def download_smard_data(
         variable_name: Name of the variable to use as column label
         start_time: Optional datetime to specify start of data collection.
                    If None, returns all available data.
+        max_workers: Maximum number of concurrent block requests
     
     Returns:
         pd.DataFrame: DataFrame with timestamp index and value column
@@ -58,17 +80,17 @@ def download_smard_data(
     all_timestamps = []
     all_values = []
 
-    # Step 2: Get data for each timestamp
-    for timestamp in timestamps:
-        data_url = f"{base_url}/chart_data/{variable}/{region}/{variable}_{region}_{resolution}_{timestamp}.json"
-        data_response = requests.get(data_url)
-        
-        if data_response.status_code != 200:
-            print(f"Warning: Error fetching data for timestamp {timestamp}: {data_response.status_code}")
+    # Step 2: Get data for each timestamp; requests are network-bound, so overlap them
+    data_urls = [
+        f"{base_url}/chart_data/{variable}/{region}/{variable}_{region}_{resolution}_{timestamp}.json"
+        for timestamp in timestamps
+    ]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(data_urls))) as executor:
+        all_series = list(executor.map(_fetch_series, data_urls))
+
+    for series_data in all_series:
+        if series_data is None:
             continue
-            
-        data = data_response.json()
-        series_data: List[Tuple[int, float]] = data["series"]
         
         # Extract timestamps and values
         ts = [datetime.fromtimestamp(ts/1000) for ts, _ in series_data]
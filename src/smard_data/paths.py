@@ -1,22 +1,28 @@
 from pathlib import Path
+from typing import Final
 
 class ProjPaths:
+    """Project paths, computed once when the module is imported.
 
-    current_file_path = Path(__file__)
-    pkg_src_path = current_file_path.parent.parent
-    project_path = current_file_path.parent.parent.parent
-    data_path = project_path / "data"
-    raw_data_path = data_path / "raw_data"
-    processed_data_path = data_path / "processed_data"
-    output_path = project_path / "output"
+    All attributes are class-level constants, so ``ProjPaths.raw_data_path``
+    and ``ProjPaths().raw_data_path`` are equivalent.
+    """
+
+    current_file_path: Final[Path] = Path(__file__).resolve()
+    pkg_src_path: Final[Path] = current_file_path.parents[1]
+    project_path: Final[Path] = current_file_path.parents[2]
+    data_path: Final[Path] = project_path / "data"
+    raw_data_path: Final[Path] = data_path / "raw_data"
+    processed_data_path: Final[Path] = data_path / "processed_data"
+    output_path: Final[Path] = project_path / "output"
     
-    reports_path = output_path / "reports"
-    images_path = output_path / "images"
-    video_story_path = output_path / "video_story"
+    reports_path: Final[Path] = output_path / "reports"
+    images_path: Final[Path] = output_path / "images"
+    video_story_path: Final[Path] = output_path / "video_story"
 
-    generation_raw_data_path = raw_data_path / "generation"
-    consumption_raw_data_path = raw_data_path / "consumption"
-    prices_raw_data_path = raw_data_path / "prices"
-    forecasts_raw_data_path = raw_data_path / "forecasts"
+    generation_raw_data_path: Final[Path] = raw_data_path / "generation"
+    consumption_raw_data_path: Final[Path] = raw_data_path / "consumption"
+    prices_raw_data_path: Final[Path] = raw_data_path / "prices"
+    forecasts_raw_data_path: Final[Path] = raw_data_path / "forecasts"
 
-    data_analysis_report_path = reports_path / "01_data_analysis"
+    data_analysis_report_path: Final[Path] = reports_path / "01_data_analysis"
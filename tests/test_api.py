@@ -1,5 +1,6 @@
 """Tests for the SMARD API functions."""
 
+import itertools
 import pytest
 from datetime import datetime
 import pandas as pd
@@ -7,148 +8,179 @@ from unittest.mock import patch, Mock
 from smard_data.api import download_smard_data
 from smard_data.config import Resolution, Region, Variable
 
-@pytest.fixture
-def mock_timestamps_response():
-    return {
-        "timestamps": [
-            1640995200000,  # 2022-01-01 00:00:00
-            1641081600000,  # 2022-01-02 00:00:00
-            1641168000000   # 2022-01-03 00:00:00
-        ]
-    }
+@pytest.fixture(scope="module", autouse=True)
+def _mock_requests():
+    """Patch `requests.get` at its import site once for the whole module."""
+    with patch("smard_data.api.requests.get") as mock:
+        yield mock
 
 @pytest.fixture
-def mock_data_response():
-    return {
-        "series": [
-            [1641024000000, 100.5],  # 2022-01-01 00:00:00
-            [1641027600000, 200.7],  # 2022-01-01 01:00:00
-        ]
-    }
-
-def test_download_smard_data_success(mock_timestamps_response, mock_data_response):
+def mock_get(_mock_requests):
+    """Return the shared `requests.get` mock, reset for the current test."""
+    _mock_requests.reset_mock(return_value=True, side_effect=True)
+    return _mock_requests
+
+def _json_response(payload):
+    """Build a successful response mock returning `payload` from `json()`."""
+    response = Mock(status_code=200)
+    response.json.return_value = payload
+    return response
+
+MOCK_TIMESTAMPS = {
+    "timestamps": [
+        1640995200000,  # 2022-01-01 00:00:00
+        1641081600000,  # 2022-01-02 00:00:00
+        1641168000000   # 2022-01-03 00:00:00
+    ]
+}
+
+MOCK_DATA = {
+    "series": [
+        [1641024000000, 100.5],  # 2022-01-01 00:00:00
+        [1641027600000, 200.7],  # 2022-01-01 01:00:00
+    ]
+}
+
+# Timestamps after the start_time used in test_download_smard_data_with_start_time
+MOCK_DATA_AFTER_START = {
+    "series": [
+        [1641081600000, 100.5],  # 2022-01-02 00:00:00
+        [1641085200000, 200.7],  # 2022-01-02 01:00:00
+    ]
+}
+
+# Response mocks are built once and shared by all tests. They still record calls
+# and attribute access across tests, so assert on `mock_get`, never on these.
+_RESP_TS = _json_response(MOCK_TIMESTAMPS)
+_RESP_NO_TS = _json_response({"timestamps": []})
+_RESP_DATA = _json_response(MOCK_DATA)
+_RESP_DATA_AFTER_START = _json_response(MOCK_DATA_AFTER_START)
+_RESP_NOT_FOUND = Mock(status_code=404)
+_RESP_SERVER_ERROR = Mock(status_code=500)
+
+def test_download_smard_data_success(mock_get):
     """Test successful data download and processing."""
-    with patch('requests.get') as mock_get:
-        # Configure mock responses for multiple timestamp requests
-        mock_get.side_effect = [
-            Mock(status_code=200, json=lambda: mock_timestamps_response),
-            Mock(status_code=200, json=lambda: mock_data_response),
-            Mock(status_code=200, json=lambda: mock_data_response),
-            Mock(status_code=200, json=lambda: mock_data_response)
-        ]
-        
-        # Call function with test parameters
-        df = download_smard_data(
+    # Configure mock responses: the timestamps, then data for however many blocks are requested
+    mock_get.side_effect = itertools.chain([_RESP_TS], itertools.cycle([_RESP_DATA]))
+    
+    # Call function with test parameters
+    df = download_smard_data(
+        region=Region.DE.value,
+        resolution=Resolution.HOUR.value,
+        variable=Variable.SOLAR.value,
+        variable_name="solar"
+    )
+    
+    # Verify the result
+    assert isinstance(df, pd.DataFrame)
+    assert len(df) == 2  # After deduplication
+    assert list(df.columns) == ["solar"]
+    assert df.index.name == "timestamp"
+    assert pd.api.types.is_datetime64_any_dtype(df.index)
+    assert mock_get.call_count == 4  # One for timestamps, three for data
+
+def test_download_smard_data_with_start_time(mock_get):
+    """Test data download with start_time parameter."""
+    mock_get.side_effect = [_RESP_TS, _RESP_DATA_AFTER_START, _RESP_DATA_AFTER_START]
+    
+    start_time = datetime(2022, 1, 2)  # Should only get data from second timestamp
+    df = download_smard_data(
+        region=Region.DE.value,
+        resolution=Resolution.HOUR.value,
+        variable=Variable.SOLAR.value,
+        variable_name="solar",
+        start_time=start_time
+    )
+    
+    # Verify requests were made correctly
+    assert mock_get.call_count == 3  # One for timestamps, two for data
+    assert isinstance(df, pd.DataFrame)
+    assert len(df) > 0  # Verify we got some data
+    assert df.index.is_monotonic_increasing
+    assert df.index[0] >= pd.Timestamp(start_time)  # Verify data starts after our start_time
+
+def test_download_smard_data_concurrent_blocks(mock_get):
+    """Test that concurrently fetched blocks are all combined in timestamp order."""
+    def mock_response(url):
+        if "index_" in url:
+            return _RESP_TS
+        block_start = int(url.rsplit("_", 1)[1].removesuffix(".json"))
+        series = [[block_start, 1.0], [block_start + 3600000, 2.0]]
+        return _json_response({"series": series})
+
+    mock_get.side_effect = mock_response
+    df = download_smard_data(
+        region=Region.DE.value,
+        resolution=Resolution.HOUR.value,
+        variable=Variable.SOLAR.value,
+        variable_name="solar",
+        max_workers=3
+    )
+
+    assert len(df) == 6  # Two observations from each of the three blocks
+    assert df.index.is_monotonic_increasing
+    assert list(df["solar"]) == [1.0, 2.0] * 3
+
+def test_download_smard_data_timestamp_error(mock_get):
+    """Test error handling when timestamp request fails."""
+    mock_get.return_value = _RESP_NOT_FOUND
+    
+    with pytest.raises(RuntimeError) as exc_info:
+        download_smard_data(
             region=Region.DE.value,
             resolution=Resolution.HOUR.value,
             variable=Variable.SOLAR.value,
             variable_name="solar"
         )
-        
-        # Verify the result
-        assert isinstance(df, pd.DataFrame)
-        assert len(df) == 2  # After deduplication
-        assert list(df.columns) == ["solar"]
-        assert df.index.name == "timestamp"
-        assert all(isinstance(idx, datetime) for idx in df.index)
-
-def test_download_smard_data_with_start_time(mock_timestamps_response, mock_data_response):
-    """Test data download with start_time parameter."""
-    with patch('requests.get') as mock_get:
-        # Update mock_data_response to have timestamps after start_time
-        updated_mock_data = {
-            "series": [
-                [1641081600000, 100.5],  # 2022-01-02 00:00:00
-                [1641085200000, 200.7],  # 2022-01-02 01:00:00
-            ]
-        }
-        
-        mock_get.side_effect = [
-            Mock(status_code=200, json=lambda: mock_timestamps_response),
-            Mock(status_code=200, json=lambda: updated_mock_data),
-            Mock(status_code=200, json=lambda: updated_mock_data)
-        ]
-        
-        start_time = datetime(2022, 1, 2)  # Should only get data from second timestamp
-        df = download_smard_data(
+    
+    assert "Error fetching timestamps: 404" in str(exc_info.value)
+
+def test_download_smard_data_empty_timestamps(mock_get):
+    """Test error handling when no timestamps are available."""
+    mock_get.return_value = _RESP_NO_TS
+    
+    with pytest.raises(RuntimeError) as exc_info:
+        download_smard_data(
             region=Region.DE.value,
             resolution=Resolution.HOUR.value,
             variable=Variable.SOLAR.value,
-            variable_name="solar",
-            start_time=start_time
+            variable_name="solar"
         )
-        
-        # Verify requests were made correctly
-        assert mock_get.call_count == 3  # One for timestamps, two for data
-        assert isinstance(df, pd.DataFrame)
-        assert len(df) > 0  # Verify we got some data
-        assert min(df.index) >= start_time  # Verify data starts after our start_time
-def test_download_smard_data_timestamp_error():
-    """Test error handling when timestamp request fails."""
-    with patch('requests.get') as mock_get:
-        mock_get.return_value = Mock(status_code=404)
-        
-        with pytest.raises(RuntimeError) as exc_info:
-            download_smard_data(
-                region=Region.DE.value,
-                resolution=Resolution.HOUR.value,
-                variable=Variable.SOLAR.value,
-                variable_name="solar"
-            )
-        
-        assert "Error fetching timestamps: 404" in str(exc_info.value)
-
-def test_download_smard_data_empty_timestamps(mock_timestamps_response):
-    """Test error handling when no timestamps are available."""
-    mock_timestamps_response["timestamps"] = []
     
-    with patch('requests.get') as mock_get:
-        mock_get.return_value = Mock(status_code=200, json=lambda: mock_timestamps_response)
-        
-        with pytest.raises(RuntimeError) as exc_info:
-            download_smard_data(
-                region=Region.DE.value,
-                resolution=Resolution.HOUR.value,
-                variable=Variable.SOLAR.value,
-                variable_name="solar"
-            )
-        
-        assert "No timestamps available" in str(exc_info.value)
-
-def test_download_smard_data_partial_data_success(mock_timestamps_response, mock_data_response):
+    assert "No timestamps available" in str(exc_info.value)
+
+def test_download_smard_data_partial_data_success(mock_get):
     """Test successful data collection when some requests fail."""
-    with patch('requests.get') as mock_get:
-        mock_get.side_effect = [
-            Mock(status_code=200, json=lambda: mock_timestamps_response),
-            Mock(status_code=200, json=lambda: mock_data_response),
-            Mock(status_code=500),  # This request fails
-            Mock(status_code=200, json=lambda: mock_data_response)
-        ]
-        
-        df = download_smard_data(
+    mock_get.side_effect = [
+        _RESP_TS,
+        _RESP_DATA,
+        _RESP_SERVER_ERROR,  # This request fails
+        _RESP_DATA
+    ]
+    
+    df = download_smard_data(
+        region=Region.DE.value,
+        resolution=Resolution.HOUR.value,
+        variable=Variable.SOLAR.value,
+        variable_name="solar"
+    )
+    
+    # Should still get data from successful requests
+    assert isinstance(df, pd.DataFrame)
+    assert len(df) > 0
+
+def test_download_smard_data_start_time_no_data(mock_get):
+    """Test error handling when no data is available after start_time."""
+    mock_get.return_value = _RESP_TS
+    
+    future_date = datetime(2025, 1, 1)
+    with pytest.raises(RuntimeError) as exc_info:
+        download_smard_data(
             region=Region.DE.value,
             resolution=Resolution.HOUR.value,
             variable=Variable.SOLAR.value,
-            variable_name="solar"
+            variable_name="solar",
+            start_time=future_date
         )
-        
-        # Should still get data from successful requests
-        assert isinstance(df, pd.DataFrame)
-        assert len(df) > 0
-
-def test_download_smard_data_start_time_no_data(mock_timestamps_response):
-    """Test error handling when no data is available after start_time."""
-    with patch('requests.get') as mock_get:
-        mock_get.return_value = Mock(status_code=200, json=lambda: mock_timestamps_response)
-        
-        future_date = datetime(2025, 1, 1)
-        with pytest.raises(RuntimeError) as exc_info:
-            download_smard_data(
-                region=Region.DE.value,
-                resolution=Resolution.HOUR.value,
-                variable=Variable.SOLAR.value,
-                variable_name="solar",
-                start_time=future_date
-            )
-        
-        assert "No data available after" in str(exc_info.value) 
\ No newline at end of file
+    
+    assert "No data available after" in str(exc_info.value) 
\ No newline at end of file
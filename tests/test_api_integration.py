@@ -1,55 +1,88 @@
 """Integration tests for the SMARD API functions.
 
 These tests make actual API calls and should be run with caution.
-They may fail if the API is down or has changed.
+They may fail if the API is down or has changed. They are skipped by
+default; run them with `pytest -m integration`.
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+import pytest
 import pandas as pd
 from smard_data.api import download_smard_data
 from smard_data.config import Resolution, Region, Variable
 
-def test_download_data():
+pytestmark = pytest.mark.integration
+
+START_TIME = datetime.now() - timedelta(days=200)
+
+# Test combinations of parameters
+TEST_PARAMS = [
+    # First combination
+    {
+        "region": Region.DE.value,
+        "resolution": Resolution.HOUR.value,
+        "variable": Variable.SOLAR.value,
+        "variable_name": "solar"
+    },
+    # Second combination 
+    {
+        "region": Region.AT.value,
+        "resolution": Resolution.DAY.value,
+        "variable": Variable.BIOMASS.value,
+        "variable_name": "biomass"
+    }
+]
+
+def _download(params):
+    return download_smard_data(start_time=START_TIME, **params)
+
+def _cache_key(params):
+    return tuple(sorted(params.items()))
+
+@pytest.fixture(scope="session")
+def smard_executor():
+    """Thread pool on which the session's downloads run concurrently."""
+    with ThreadPoolExecutor(max_workers=len(TEST_PARAMS)) as executor:
+        yield executor
+
+@pytest.fixture(scope="session")
+def smard_cache(smard_executor):
+    """Start downloading all parameter sets at once, keeping one future per set."""
+    return {_cache_key(params): smard_executor.submit(_download, params) for params in TEST_PARAMS}
+
+@pytest.fixture
+def get_data(smard_cache, smard_executor):
+    """Download SMARD data for the given parameters, reusing earlier downloads.
+
+    A failed download only raises in the tests that use its parameters.
+    """
+    def _get(params):
+        key = _cache_key(params)
+        if key not in smard_cache:
+            smard_cache[key] = smard_executor.submit(_download, params)
+        return smard_cache[key].result()
+    return _get
+
+@pytest.mark.parametrize("params", TEST_PARAMS)
+def test_download_data(get_data, params):
     """Test downloading data with different parameters."""
-    start_time = datetime.now() - timedelta(days=200)
-
-    # Test combinations of parameters
-    test_params = [
-        # First combination
-        {
-            "region": Region.DE.value,
-            "resolution": Resolution.HOUR.value,
-            "variable": Variable.SOLAR.value,
-            "variable_name": "solar"
-        },
-        # Second combination 
-        {
-            "region": Region.AT.value,
-            "resolution": Resolution.DAY.value,
-            "variable": Variable.BIOMASS.value,
-            "variable_name": "biomass"
-        }
-    ]
-
-    for params in test_params:
-        df = download_smard_data(
-            start_time=start_time,
-            **params
-        )
-
-        # Basic data validation
-        assert isinstance(df, pd.DataFrame)
-        assert len(df) > 0
-        assert params["variable_name"] in df.columns
-        assert all(isinstance(idx, datetime) for idx in df.index)
-        assert min(df.index) >= start_time
-        assert max(df.index) <= datetime.now()
-
-        # Data range validation
-        values = df[params["variable_name"]]
-        assert all(values >= 0)  # Power generation can't be negative
-        assert all(values < 50000)  # Typical generation never exceeds 50GW
-
-        if params["resolution"] == Resolution.HOUR.value:
-            # Hourly data should have more granular entries
-            assert len(df) > 24  # At least a day's worth of hourly data
\ No newline at end of file
+    df = get_data(params)
+
+    # Basic data validation
+    assert isinstance(df, pd.DataFrame)
+    assert len(df) > 0
+    assert params["variable_name"] in df.columns
+    assert pd.api.types.is_datetime64_any_dtype(df.index)
+    assert df.index.is_monotonic_increasing
+    assert df.index[0] >= pd.Timestamp(START_TIME)
+    assert df.index[-1] <= pd.Timestamp.now()
+
+    # Data range validation
+    values = df[params["variable_name"]]
+    assert (values >= 0).all()  # Power generation can't be negative
+    assert values.max() < 50000  # Typical generation never exceeds 50GW
+
+    if params["resolution"] == Resolution.HOUR.value:
+        # Hourly data should have more granular entries
+        assert len(df) > 24  # At least a day's worth of hourly data